@@ -0,0 +1,140 @@
+import json
+import mmap
+import os
+import tempfile
+import orjson
+import numpy as np
+
+# Bump whenever parsing or filtering changes so stale .npz caches are rebuilt
+CACHE_VERSION = 3
+
+def find_object_end(content, start):
+    """Return the offset just past the {...} object opening at start, or -1 if it never closes"""
+    find = content.find
+    depth = 1
+    k = start + 1
+    while depth:
+        # Jump to the next brace instead of stepping through every character
+        close = find(b'}', k)
+        if close == -1:
+            return -1
+        opening = find(b'{', k, close)
+        if opening == -1:
+            depth -= 1
+            k = close + 1
+        else:
+            depth += 1
+            k = opening + 1
+    return k
+
+def decode_object(obj):
+    """Decode one JSON object, returning None (with a warning) if it is malformed"""
+    try:
+        return orjson.loads(obj)
+    except orjson.JSONDecodeError:
+        pass
+    # orjson rejects NaN/Infinity tokens that the stdlib parser accepts
+    try:
+        return json.loads(obj)
+    except json.JSONDecodeError as e:
+        print(f"Skipping malformed object: {obj[:100].decode(errors='replace')}...\nError: {e}")
+        return None
+
+def iter_json_objects(content):
+    """Yield each top-level JSON object from comma-separated/concatenated text"""
+    find = content.find
+    i = 0
+    while True:
+        start = find(b'{', i)
+        if start == -1:
+            return
+        end = find_object_end(content, start)
+        if end == -1:
+            print(f"Skipping malformed object: {content[start:start+100].decode(errors='replace')}...\n"
+                  "Error: object is never closed")
+            # The logger writes flat objects, so the next '{' starts the next record
+            i = start + 1
+            continue
+        obj = decode_object(content[start:end])
+        if obj is None:
+            i = start + 1
+            continue
+        yield obj
+        i = end
+
+def timestamps_to_seconds(timestamps):
+    """Convert a sequence of hh:mm:ss or mm:ss strings to total seconds in one vectorized pass"""
+    ts = np.char.strip(np.asarray(timestamps, dtype=str))
+    if not ts.size:
+        return np.zeros(0, dtype=np.int64)
+    # Non-ASCII characters become '?' so those rows fail the digit check below
+    ts = np.char.encode(ts, 'ascii', 'replace')
+    # Pad mm:ss rows to hh:mm:ss so every row splits into three fields
+    ts = np.where(np.char.count(ts, b':') == 1, np.char.add(b'0:', ts), ts)
+    head = np.char.partition(ts, b':')
+    tail = np.char.partition(head[:, 2], b':')
+    fields = np.stack((head[:, 0], tail[:, 0], tail[:, 2]), axis=1)
+    # Unparseable timestamps count as 00:00:00
+    valid = (np.char.isdigit(fields) & (np.char.str_len(fields) <= 2)).all(axis=1)
+    fields[~valid] = b'0'
+    # Zero-pad every field to two ASCII digits and read them straight off the bytes
+    digits = np.char.zfill(fields, 2).astype('S2').view(np.uint8).reshape(-1, 3, 2) - 48
+    return (digits[..., 0] * 10 + digits[..., 1]).astype(np.int64) @ np.array([3600, 60, 1])
+
+def load_points(filename):
+    """Load the logger's comma-separated JSON objects, dropping malformed and (0,0) points"""
+    with open(filename, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+        # Map the file rather than reading it into one big string
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+            # Parse object by object so one bad reading doesn't discard the whole file
+            data = list(iter_json_objects(content))
+
+    # Filter invalid points
+    return [
+        p for p in data
+        if isinstance(p, dict)
+        and 'lat' in p and 'lng' in p
+        and (p['lat'] != 0 or p['lng'] != 0)
+    ]
+
+def points_to_arrays(points):
+    """Build one contiguous array per field from a list of points"""
+    n = len(points)
+    timestamps = np.asarray([p.get('timestamp', '') for p in points], dtype=str)
+    return {
+        'lat': np.fromiter((p['lat'] for p in points), np.float64, n),
+        'lng': np.fromiter((p['lng'] for p in points), np.float64, n),
+        'altitude': np.fromiter((p.get('altitude', 0) for p in points), np.float64, n),
+        'dht_temp': np.fromiter((p.get('dht_temp', 0) for p in points), np.float64, n),
+        'dht_humidity': np.fromiter((p.get('dht_humidity', 0) for p in points), np.float64, n),
+        'timestamp': timestamps,
+        'seconds': timestamps_to_seconds(timestamps),
+    }
+
+def load_hike(filename):
+    """Load a hike as a dict of per-field arrays, reusing the .npz cache beside the file while it's fresh"""
+    cache = os.path.splitext(filename)[0] + '.npz'
+    mtime = os.path.getmtime(filename)
+    try:
+        with np.load(cache) as cached:
+            if cached['version'] == CACHE_VERSION and cached['mtime'] == mtime:
+                return {key: cached[key] for key in cached.files if key not in ('version', 'mtime')}
+    except Exception:
+        pass  # missing, truncated or old-format cache: parse the JSON again
+
+    hike = points_to_arrays(load_points(filename))
+
+    # Write to a temp file and swap it in, so readers never see a half-written cache
+    tmp = None
+    try:
+        fd, tmp = tempfile.mkstemp(suffix='.npz', dir=os.path.dirname(cache) or '.')
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, version=CACHE_VERSION, mtime=mtime, **hike)
+        os.replace(tmp, cache)
+    except OSError:
+        # Caching is best-effort; an unwritable directory just means no cache
+        if tmp and os.path.exists(tmp):
+            os.remove(tmp)
+    return hike
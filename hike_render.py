@@ -0,0 +1,35 @@
+import folium
+import numpy as np
+from shapely.geometry import LineString
+
+def colormap_hex(colormap, values):
+    """Vectorized equivalent of [colormap(v) for v in values] for a LinearColormap"""
+    # Interpolate each RGBA channel between the colormap stops in one pass
+    rgba = np.column_stack([
+        np.interp(values, colormap.index, [c[j] for c in colormap.colors])
+        for j in range(4)
+    ])
+    rgba = (rgba * 255.9999).astype(np.uint8)
+    return ['#%02x%02x%02x%02x' % tuple(c) for c in rgba.tolist()]
+
+def add_altitude_bands(m, lats, lngs, altitudes, colormap, bands=8, tolerance=1e-5, **kwargs):
+    """Draw the path as one simplified PolyLine per contiguous run of points in the same altitude band"""
+    # Band edges follow the colormap's range, which already holds the altitude extremes
+    edges = np.linspace(colormap.vmin, colormap.vmax, bands + 1)
+    band = np.digitize(altitudes, edges[1:-1])
+    band_colors = colormap_hex(colormap, (edges[:-1] + edges[1:]) / 2)
+
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(band)) + 1))
+    ends = np.append(starts[1:] + 1, len(band))  # overlap one point so the runs join up
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        if end - start < 2:
+            continue
+        # Douglas-Peucker drops near-collinear points (tolerance in degrees, ~1 m)
+        run = LineString(np.column_stack((lngs[start:end], lats[start:end]))).simplify(tolerance)
+        if run.is_empty:
+            continue
+        folium.PolyLine(
+            locations=[(lat, lng) for lng, lat in run.coords],
+            color=band_colors[band[start]],
+            **kwargs
+        ).add_to(m)
@@ -1,65 +1,52 @@
-import json
+import os
 import folium
+from shapely.geometry import LineString
+import numpy as np
+import matplotlib as mpl
+
+# Render off-screen unless a plot window is explicitly requested with SHOW_PLOT=1
+SHOW_PLOT = bool(os.environ.get('SHOW_PLOT'))
+if not SHOW_PLOT:
+    mpl.use('Agg')
+
+import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
-from datetime import datetime
-import re
-
-def load_hike_data(filename):
-    """Load JSON data that contains multiple separate objects with potential formatting issues"""
-    data = []
-    with open(filename, 'r') as f:
-        # Read the entire file content
-        content = f.read()
-        
-        # Remove any trailing commas and whitespace
-        content = content.strip().rstrip(',')
-        
-        # Handle cases where objects might be separated improperly
-        # This regex matches individual JSON objects
-        json_objects = re.findall(r'\{.*?\}(?=\s*,\s*\{|$)', content, re.DOTALL)
-        
-        for obj in json_objects:
-            try:
-                # Clean up the object string
-                obj = obj.strip()
-                if not obj.startswith('{'):
-                    continue
-                if not obj.endswith('}'):
-                    obj += '}'
-                
-                # Parse the JSON object
-                data.append(json.loads(obj))
-            except json.JSONDecodeError as e:
-                print(f"Skipping malformed object: {obj[:100]}...\nError: {e}")
-    
-    # Filter out points with invalid coordinates (0,0)
-    valid_data = [point for point in data if point['lat'] != 0 or point['lng'] != 0]
-    
-    return valid_data
-
-# 1. Load the data
-hike_data = load_hike_data('152025.json')
-
-if not hike_data:
+from hike_io import load_hike
+
+# Long tracks: let Agg draw the lines in chunks and drop sub-pixel vertices
+mpl.rcParams['agg.path.chunksize'] = 10000
+mpl.rcParams['path.simplify'] = True
+mpl.rcParams['path.simplify_threshold'] = 1.0
+
+# 1. Load the data as one array per field
+hike = load_hike('152025.json')
+n = len(hike['lat'])
+
+if not n:
     print("No valid data points found!")
     exit()
 
+lats, lngs, altitudes = hike['lat'], hike['lng'], hike['altitude']
+temps, humidities = hike['dht_temp'], hike['dht_humidity']
+timestamps = hike['timestamp']
+
 # --- 2. Generate Interactive Map ---
-coordinates = [(point["lat"], point["lng"]) for point in hike_data]
-m = folium.Map(location=coordinates[0], zoom_start=15, tiles='OpenStreetMap')
+coordinates = np.column_stack((lats, lngs)).tolist()
+m = folium.Map(location=coordinates[0], zoom_start=15, tiles='OpenStreetMap', prefer_canvas=True)
 
-# Add path with elevation-based color gradient
-altitudes = [p["altitude"] for p in hike_data]
-min_alt, max_alt = min(altitudes), max(altitudes)
+# Start zoomed to the track's bounding box
+m.fit_bounds([[lats.min(), lngs.min()], [lats.max(), lngs.max()]])
 
-def get_color(alt):
-    """Return color based on altitude (green to red gradient)"""
-    normalized = (alt - min_alt) / (max_alt - min_alt)
-    return f"hsl({120 * (1 - normalized)}, 100%, 50%)"
+# Altitude range for the elevation legend and plot
+min_alt, max_alt = altitudes.min(), altitudes.max()
 
-# Draw path
+# Draw path, simplified with Douglas-Peucker (tolerance in degrees, ~1 m)
+path = coordinates
+if n > 1:
+    line = LineString(np.column_stack((lngs, lats))).simplify(1e-5, preserve_topology=False)
+    path = [(lat, lng) for lng, lat in line.coords]
 folium.PolyLine(
-    locations=coordinates,
+    locations=path,
     color='blue',
     weight=5,
     opacity=0.8,
@@ -69,13 +56,13 @@ folium.PolyLine(
 # Add markers for start and end
 folium.Marker(
     coordinates[0],
-    popup=f"Start<br>Time: {hike_data[0]['timestamp']}<br>Alt: {altitudes[0]:.1f}m",
+    popup=f"Start<br>Time: {timestamps[0]}<br>Alt: {altitudes[0]:.1f}m",
     icon=folium.Icon(color='green', icon='play')
 ).add_to(m)
 
 folium.Marker(
     coordinates[-1],
-    popup=f"End<br>Time: {hike_data[-1]['timestamp']}<br>Alt: {altitudes[-1]:.1f}m",
+    popup=f"End<br>Time: {timestamps[-1]}<br>Alt: {altitudes[-1]:.1f}m",
     icon=folium.Icon(color='red', icon='stop')
 ).add_to(m)
 
@@ -99,25 +86,19 @@ m.get_root().html.add_child(folium.Element(legend_html))
 
 # Save map
 m.save('hike_path.html')
-print(f"Interactive map saved to hike_path.html with {len(hike_data)} points")
+print(f"Interactive map saved to hike_path.html with {n} points")
 
 # --- 3. Create Data Visualizations ---
 plt.style.use('ggplot')
 
 # Convert timestamps
-times = []
-for point in hike_data:
-    try:
-        times.append(datetime.strptime(point["timestamp"], "%H:%M:%S"))
-    except ValueError:
-        # Handle timestamps with single-digit hours
-        if point["timestamp"].count(':') == 1:
-            times.append(datetime.strptime(point["timestamp"], "%M:%S"))
-        else:
-            times.append(datetime.strptime("00:00:00", "%H:%M:%S"))
+seconds = hike['seconds']
+# Convert once to Matplotlib date numbers so the axes don't each re-convert datetimes
+times = mdates.date2num(np.datetime64('1900-01-01') + seconds.astype('timedelta64[s]'))
 
 # Create figure with subplots
 fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(12, 10), sharex=True)
+ax3.xaxis_date()
 
 # Altitude plot
 ax1.plot(times, altitudes, 'b-', label='Altitude')
@@ -127,13 +108,13 @@ ax1.legend()
 ax1.grid(True, alpha=0.3)
 
 # Temperature plot
-ax2.plot(times, [p.get("dht_temp", 0) for p in hike_data], 'r-', label='Temperature')
+ax2.plot(times, temps, 'r-', label='Temperature')
 ax2.set_ylabel('Temperature (°C)')
 ax2.legend()
 ax2.grid(True, alpha=0.3)
 
 # Humidity plot
-ax3.plot(times, [p.get("dht_humidity", 0) for p in hike_data], 'g-', label='Humidity')
+ax3.plot(times, humidities, 'g-', label='Humidity')
 ax3.set_ylabel('Humidity (%)')
 ax3.set_xlabel('Time')
 ax3.legend()
@@ -144,4 +125,6 @@ plt.suptitle('Hike Data Analysis', y=0.98)
 plt.tight_layout()
 plt.savefig('hike_data.png', dpi=120)
 print("Data visualization saved to hike_data.png")
-plt.show()
\ No newline at end of file
+if SHOW_PLOT:
+    plt.show()
+plt.close(fig)
@@ -1,130 +1,121 @@
-import json
 import folium
 import math
+import numpy as np
 from branca.colormap import LinearColormap
+from hike_io import load_hike
+from hike_render import add_altitude_bands
+import sys
 import webbrowser
 
 def haversine(lon1, lat1, lon2, lat2):
-    """Calculate distance between two points using Haversine formula"""
+    """Calculate distance between points using Haversine formula (accepts NumPy arrays)"""
     R = 6371  # Earth radius in km
-    dLat = math.radians(lat2 - lat1)
-    dLon = math.radians(lon2 - lon1)
-    a = (math.sin(dLat/2) ** 2 +
-         math.cos(math.radians(lat1)) *
-         math.cos(math.radians(lat2)) *
-         math.sin(dLon/2) ** 2)
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    dLat = np.radians(lat2 - lat1)
+    dLon = np.radians(lon2 - lon1)
+    a = (np.sin(dLat/2) ** 2 +
+         np.cos(np.radians(lat1)) *
+         np.cos(np.radians(lat2)) *
+         np.sin(dLon/2) ** 2)
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
     return R * c
 
-def time_to_seconds(t):
-    """Convert hh:mm:ss or mm:ss string to total seconds"""
-    parts = t.strip().split(":")
-    parts = [int(p) for p in parts]
-    while len(parts) < 3:
-        parts.insert(0, 0)  # handle mm:ss
-    hours, minutes, seconds = parts
-    return hours * 3600 + minutes * 60 + seconds
-
-def load_data(filename):
-    """Load your custom JSON format"""
-    data = []
-    with open(filename, 'r') as f:
-        text = f.read().strip()
-
-        # Remove trailing comma if present
-        if text.endswith(","):
-            text = text[:-1]
-
-        # Wrap in []
-        text = f"[{text}]"
-
-        try:
-            data = json.loads(text)
-        except json.JSONDecodeError as e:
-            print("JSON error:", e)
-            return []
-
-    # Filter invalid points
-    return [
-        p for p in data
-        if isinstance(p, dict)
-        and 'lat' in p and 'lng' in p
-        and (p['lat'] != 0 or p['lng'] != 0)
-    ]
+def segment_distances(lats, lngs):
+    """Distance in km between consecutive points, using the cheap-ruler approximation for small tracks"""
+    # Flat-earth scaling is only accurate over short spans; fall back to Haversine otherwise
+    if haversine(lngs.min(), lats.min(), lngs.max(), lats.max()) > 200:
+        return haversine(lngs[:-1], lats[:-1], lngs[1:], lats[1:])
+
+    # Mapbox cheap ruler: WGS84 km-per-degree scales evaluated once at the mean latitude
+    RE = 6378.137  # equatorial radius in km
+    E2 = (1 / 298.257223563) * (2 - 1 / 298.257223563)
+    cos_lat0 = math.cos(math.radians(lats.mean()))
+    w2 = 1 / (1 - E2 * (1 - cos_lat0 * cos_lat0))
+    w = math.sqrt(w2)
+    kx = math.radians(RE * w * cos_lat0)
+    ky = math.radians(RE * w * w2 * (1 - E2))
+    return np.hypot(kx * np.diff(lngs), ky * np.diff(lats))
 
 # Load data
-hike_data = load_data('152025.json')
+hike = load_hike('152025.json')
+n = len(hike['lat'])
 
-if not hike_data:
+if not n:
     print("No valid data points found!")
     exit()
 
-# Calculate distances and speeds
-distances = [0]
-speeds = [0]
+lats, lngs, altitudes = hike['lat'], hike['lng'], hike['altitude']
+timestamps = hike['timestamp'].tolist()
+times_sec = hike['seconds']
 
-for i in range(1, len(hike_data)):
-    prev = hike_data[i-1]
-    curr = hike_data[i]
+# Calculate distances and speeds over whole arrays at once
+segments = segment_distances(lats, lngs)
+distances = np.concatenate(([0.0], np.cumsum(segments)))
 
-    dist = haversine(
-        prev['lng'], prev['lat'],
-        curr['lng'], curr['lat']
-    )
-    distances.append(distances[-1] + dist)
-
-    dt = time_to_seconds(curr['timestamp']) - time_to_seconds(prev['timestamp'])
-    dt = max(dt, 1)  # avoid divide by zero
-    speed = (dist / dt) * 3600  # km/h
-    speeds.append(speed)
+dt = np.maximum(np.diff(times_sec), 1)  # avoid divide by zero
+speeds = np.concatenate(([0.0], segments / dt * 3600))  # km/h
 
-altitudes = [p.get('altitude', 0) for p in hike_data]
+min_alt, max_alt = altitudes.min(), altitudes.max()
 
 # Create map
 m = folium.Map(
-    location=[hike_data[0]['lat'], hike_data[0]['lng']],
+    location=[lats[0], lngs[0]],
     zoom_start=14,
     tiles='https://{s}.tile.thunderforest.com/outdoors/{z}/{x}/{y}.png',
-    attr='Thunderforest Outdoors'
+    attr='Thunderforest Outdoors',
+    prefer_canvas=True
 )
 
+# Start zoomed to the track's bounding box
+m.fit_bounds([[lats.min(), lngs.min()], [lats.max(), lngs.max()]])
+
 # Add colored path by altitude
 colormap = LinearColormap(['blue', 'green', 'yellow', 'red'],
-                          vmin=min(altitudes),
-                          vmax=max(altitudes))
-
-folium.PolyLine(
-    locations=[(p['lat'], p['lng']) for p in hike_data],
-    weight=6,
-    color=[colormap(alt) for alt in altitudes]
-).add_to(m)
-
-# Add a circle marker for each point
-for i, p in enumerate(hike_data):
-    popup_text = (
-        f"<b>Time:</b> {p.get('timestamp', '')}<br>"
-        f"<b>Altitude:</b> {p.get('altitude', '')} m<br>"
-        f"<b>Speed:</b> {speeds[i]:.2f} km/h"
+                          vmin=min_alt,
+                          vmax=max_alt)
+
+add_altitude_bands(m, lats, lngs, altitudes, colormap, weight=6)
+
+# Add circle markers in a single GeoJSON layer, thinned to at most MAX_MARKERS points
+MAX_MARKERS = 500
+stride = max(1, -(-n // MAX_MARKERS))  # ceiling division keeps the count <= MAX_MARKERS
+points = {
+    "type": "FeatureCollection",
+    "features": [
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [lng, lat]},
+            "properties": {
+                "time": timestamp,
+                "altitude": f"{alt} m",
+                "speed": f"{speed:.2f} km/h",
+            },
+        }
+        for timestamp, lat, lng, alt, speed in zip(
+            timestamps[::stride], lats[::stride].tolist(), lngs[::stride].tolist(),
+            altitudes[::stride].tolist(), speeds[::stride].tolist()
+        )
+    ],
+}
+folium.GeoJson(
+    points,
+    marker=folium.CircleMarker(radius=3, color='black', fill=True, fill_opacity=0.7),
+    popup=folium.GeoJsonPopup(
+        fields=['time', 'altitude', 'speed'],
+        aliases=['Time:', 'Altitude:', 'Speed:'],
+        max_width=300
     )
-    folium.CircleMarker(
-        location=[p['lat'], p['lng']],
-        radius=3,
-        color='black',
-        fill=True,
-        fill_opacity=0.7,
-        popup=folium.Popup(popup_text, max_width=300)
-    ).add_to(m)
+).add_to(m)
 
 # Add start and end markers
 folium.Marker(
-    [hike_data[0]['lat'], hike_data[0]['lng']],
-    popup=f"Start: {hike_data[0].get('timestamp', '')}",
+    [lats[0], lngs[0]],
+    popup=f"Start: {timestamps[0]}",
     icon=folium.Icon(color='green')
 ).add_to(m)
 
 folium.Marker(
-    [hike_data[-1]['lat'], hike_data[-1]['lng']],
-    popup=f"End: {hike_data[-1].get('timestamp', '')}",
+    [lats[-1], lngs[-1]],
+    popup=f"End: {timestamps[-1]}",
     icon=folium.Icon(color='red')
 ).add_to(m)
 
@@ -135,7 +126,8 @@ colormap.add_to(m)
 # Save
 map_file = 'hike_map.html'
 m.save(map_file)
-print(f"Success! Map saved with {len(hike_data)} points.")
+print(f"Success! Map saved with {n} points.")
 
-# Auto-open in browser
-webbrowser.open(map_file)
+# Auto-open in browser for interactive runs only
+if sys.stdout.isatty():
+    webbrowser.open(map_file)